@@ -10,11 +10,24 @@ GitHub: https://github.com/DonkRonk17/JSONQuery
 
 import sys
 import io
+import csv
 import json
 import re
+import math
+import mmap
+import itertools
 import argparse
+from array import array
+from functools import lru_cache
+from operator import eq, ne, gt, lt, ge, le
 from pathlib import Path
-from typing import Any, List, Dict, Union, Optional
+from typing import Any, List, Dict, Iterable, Sequence, Tuple, Union, Optional
+
+# Optional accelerators - JSONQuery works without them
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Ensure UTF-8 encoding for Windows
 if sys.platform == 'win32':
@@ -23,6 +36,44 @@ if sys.platform == 'win32':
 
 __version__ = "1.0.0"
 
+# Compiled regex type (re.Pattern is only public from Python 3.8)
+_REGEX_TYPE = type(re.compile(''))
+
+# Files at least this large are streamed when the query allows it, to
+# bound memory; orjson parses whole files faster, so it gets a higher bar
+_STREAM_MIN_SIZE = 64 * 1024 * 1024
+_STREAM_ORJSON_MIN_SIZE = 256 * 1024 * 1024
+
+# ijson backends written in C; the pure-Python one is slower than a full parse
+_IJSON_C_BACKENDS = ('yajl2_c', 'yajl2_cffi')
+
+# A real 'item' object key, plain or \u-escaped; ijson's '.item' array
+# prefix would match it too
+_ITEM_KEY_RE = re.compile(rb'"item"\s*:')
+_ESCAPED_ITEM_KEY_RE = re.compile(
+    rb'"(?:i|\\u0069)(?:t|\\u0074)(?:e|\\u0065)(?:m|\\u006[dD])"\s*:')
+
+# orjson reads integer literals this long as floats (they can pass 64 bits);
+# digits are mapped to '0' so such a run is found with a substring search
+_WIDE_INT_RUN = 19
+_BYTES_DIGITS_TO_ZERO = bytes.maketrans(b'123456789', b'000000000')
+_STR_DIGITS_TO_ZERO = str.maketrans('123456789', '000000000')
+
+# Keyword values recognized by the YAML parser and filter expressions
+_YAML_CONSTANTS = {
+    'true': True, 'yes': True, 'on': True,
+    'false': False, 'no': False, 'off': False,
+    'null': None, 'none': None, '~': None,
+}
+_FILTER_CONSTANTS = {'true': True, 'false': False, 'null': None, 'none': None}
+_NOT_CONSTANT = object()
+
+# JSON files at least this large are parsed from a memory map (with orjson)
+_MMAP_MIN_SIZE = 1024 * 1024
+
+# Query path tokens: a bare key, or a bracketed index/wildcard
+_PATH_RE = re.compile(r'([^.\[]+)|\[([^\]]*)\]?')
+
 
 class Colors:
     """ANSI color codes for terminal output"""
@@ -37,112 +88,175 @@ class Colors:
     GRAY = '\033[90m'
 
 
+def _parse_number(value: str) -> Optional[Union[int, float]]:
+    """Parse a stripped int/float literal, or return None if it is not one"""
+    digits = value[1:] if value[:1] in ('-', '+') else value
+    if digits.isdecimal():
+        return int(value)
+    if '.' in digits and digits.replace('.', '', 1).isdecimal():
+        return float(value)
+    
+    # Rarer spellings (exponents, underscores) - only worth trying when
+    # the value could start a number
+    if not value or not (value[0].isdecimal() or value[0] in '+-.'):
+        return None
+    try:
+        if '.' in value:
+            return float(value)
+        return int(value)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=None)
+def _import_yaml():
+    """
+    Import PyYAML on first use, or return None if it is missing.
+    Returns (yaml, loader), preferring the libyaml-backed safe loader.
+    """
+    try:
+        import yaml
+    except ImportError:
+        return None
+    return yaml, getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
 class YAMLParser:
-    """Simple YAML parser - supports basic YAML syntax"""
+    """
+    Simple YAML parser - supports basic YAML syntax.
+    Delegates to PyYAML's safe loader when it is installed.
+    """
     
     @staticmethod
     def parse(text: str) -> Any:
         """Parse YAML text to Python objects"""
+        pyyaml = _import_yaml()
+        if pyyaml is not None:
+            yaml, loader = pyyaml
+            return yaml.load(text, Loader=loader)
+        
         lines = text.strip().split('\n')
-        return YAMLParser._parse_lines(lines, 0)[0]
+        return YAMLParser._parse_lines(lines)
     
     @staticmethod
-    def _parse_lines(lines: List[str], start_indent: int) -> tuple:
-        """Parse lines starting from given indentation level"""
-        result = {}
-        current_list = []
-        current_key = None
-        i = 0
-        in_list = False
+    def _parse_lines(lines: List[str]) -> Any:
+        """
+        Parse block-style YAML lines in a single pass.
+        Open mappings and sequences are kept on a stack of
+        (indent, container) pairs; a 'key:' without a value opens a nested
+        block whose type is decided by the next line.
+        """
+        root = None
+        stack = []
+        pending = None  # (container, key, indent) of a 'key:' awaiting a block
         
-        while i < len(lines):
-            line = lines[i]
+        for line in lines:
+            stripped = line.strip()
             
             # Skip empty lines and comments
-            if not line.strip() or line.strip().startswith('#'):
-                i += 1
+            if not stripped or stripped.startswith('#'):
+                continue
+            
+            is_item = stripped == '-' or stripped.startswith('- ')
+            if not is_item and ': ' not in stripped and not stripped.endswith(':'):
                 continue
             
-            # Calculate indentation
             indent = len(line) - len(line.lstrip())
             
-            # If indentation decreased, we're done with this level
-            if indent < start_indent:
-                break
+            # A deeper line (or a sequence at the same indent) opens the
+            # block announced by the preceding 'key:'; otherwise it stays null
+            if pending is not None:
+                parent, key, parent_indent = pending
+                pending = None
+                if indent > parent_indent or (indent == parent_indent and is_item):
+                    block = [] if is_item else {}
+                    parent[key] = block
+                    stack.append((indent, block))
             
-            # If indentation increased, parse nested structure
-            if indent > start_indent:
-                if current_key:
-                    # Nested dict or list
-                    nested_result, lines_consumed = YAMLParser._parse_lines(lines[i:], indent)
-                    result[current_key] = nested_result
-                    i += lines_consumed
-                    current_key = None
-                    continue
-                else:
-                    i += 1
-                    continue
+            if not stack:
+                root = [] if is_item else {}
+                stack.append((indent, root))
             
-            stripped = line.strip()
+            # Close blocks indented deeper than this line, and a sequence
+            # at this indent once a non-item line follows it
+            while len(stack) > 1 and (
+                stack[-1][0] > indent or
+                (stack[-1][0] == indent and not is_item and isinstance(stack[-1][1], list))
+            ):
+                stack.pop()
             
-            # List item
-            if stripped.startswith('- '):
-                in_list = True
-                value = stripped[2:].strip()
-                
-                # List item with key-value
-                if ': ' in value:
-                    key, val = value.split(': ', 1)
-                    current_list.append({key: YAMLParser._parse_value(val)})
-                else:
-                    current_list.append(YAMLParser._parse_value(value))
-                i += 1
+            block_indent, container = stack[-1]
+            
+            # Unexpected indentation, or a line that doesn't fit the block
+            if indent != block_indent or isinstance(container, list) != is_item:
                 continue
             
-            # Key-value pair
-            if ': ' in stripped:
-                key, value = stripped.split(': ', 1)
-                key = key.strip()
-                value = value.strip()
+            content = stripped
+            if is_item:
+                # Track the column of the item's content
+                rest = stripped[1:]
+                indent += len(stripped) - len(rest.lstrip())
+                content = rest.strip()
+                
+                # Nested sequence on the same line ('- - value')
+                while content == '-' or content.startswith('- '):
+                    nested = []
+                    container.append(nested)
+                    stack.append((indent, nested))
+                    container = nested
+                    rest = content[1:]
+                    indent += len(content) - len(rest.lstrip())
+                    content = rest.strip()
                 
-                if value:
-                    result[key] = YAMLParser._parse_value(value)
+                # List item with key-value - the item becomes a mapping
+                # whose keys line up with the first one
+                if ': ' in content or content.endswith(':'):
+                    item = {}
+                    container.append(item)
+                    stack.append((indent, item))
+                    container = item
+                elif content:
+                    container.append(YAMLParser._parse_value(content))
+                    continue
                 else:
                     # Value on next line(s)
-                    current_key = key
-                
-                i += 1
-                continue
+                    container.append(None)
+                    pending = (container, len(container) - 1, indent)
+                    continue
             
-            i += 1
-        
-        if in_list:
-            return current_list, i
+            # Key-value pair
+            if ': ' in content:
+                key, value = content.split(': ', 1)
+            else:
+                key, value = content[:-1], ''
+            
+            # Interned so repeated keys share one string object
+            key = sys.intern(key.strip())
+            value = value.strip()
+            
+            if value:
+                container[key] = YAMLParser._parse_value(value)
+            else:
+                # Value on next line(s)
+                container[key] = None
+                pending = (container, key, indent)
         
-        return result if result else None, i
+        return root if root else None
     
     @staticmethod
     def _parse_value(value: str) -> Any:
         """Parse YAML value to Python type"""
         value = value.strip()
         
-        # Boolean
-        if value.lower() in ('true', 'yes', 'on'):
-            return True
-        if value.lower() in ('false', 'no', 'off'):
-            return False
-        
-        # Null
-        if value.lower() in ('null', 'none', '~'):
-            return None
+        # Boolean / null
+        constant = _YAML_CONSTANTS.get(value.lower(), _NOT_CONSTANT)
+        if constant is not _NOT_CONSTANT:
+            return constant
         
         # Number
-        try:
-            if '.' in value:
-                return float(value)
-            return int(value)
-        except ValueError:
-            pass
+        number = _parse_number(value)
+        if number is not None:
+            return number
         
         # String (remove quotes if present)
         if (value.startswith('"') and value.endswith('"')) or \
@@ -152,55 +266,33 @@ class YAMLParser:
         return value
 
 
-def parse_query_path(path: str) -> List[Union[str, int]]:
+@lru_cache(maxsize=256)
+def parse_query_path(path: str) -> Tuple[Union[str, int], ...]:
     """
     Parse query path into components.
+    Results are cached per path string, so they are returned as tuples.
     Examples:
-        'users' -> ['users']
-        'users[0]' -> ['users', 0]
-        'data.users[0].name' -> ['data', 'users', 0, 'name']
-        'items[*]' -> ['items', '*']
+        'users' -> ('users',)
+        'users[0]' -> ('users', 0)
+        'data.users[0].name' -> ('data', 'users', 0, 'name')
+        'items[*]' -> ('items', '*')
     """
     components = []
-    current = ''
-    
-    i = 0
-    while i < len(path):
-        char = path[i]
-        
-        if char == '.':
-            if current:
-                components.append(current)
-                current = ''
-        elif char == '[':
-            if current:
-                components.append(current)
-                current = ''
-            # Find matching ]
-            j = i + 1
-            while j < len(path) and path[j] != ']':
-                j += 1
-            index_str = path[i+1:j]
-            if index_str == '*':
-                components.append('*')
-            else:
-                try:
-                    components.append(int(index_str))
-                except ValueError:
-                    components.append(index_str)
-            i = j
+    for key, index in _PATH_RE.findall(path):
+        if key:
+            components.append(key)
+        elif index == '*':
+            components.append('*')
         else:
-            current += char
-        
-        i += 1
-    
-    if current:
-        components.append(current)
+            try:
+                components.append(int(index))
+            except ValueError:
+                components.append(index)
     
-    return components
+    return tuple(components)
 
 
-def query_data(data: Any, path: List[Union[str, int]]) -> Any:
+def query_data(data: Any, path: Sequence[Union[str, int]]) -> Any:
     """
     Query data using parsed path.
     Supports wildcards (*) for array iteration.
@@ -250,6 +342,184 @@ def query_data(data: Any, path: List[Union[str, int]]) -> Any:
     return None
 
 
+def compile_query(path: Sequence[Union[str, int]]):
+    """
+    Compile a parsed path into a function equivalent to
+    lambda data: query_data(data, path).
+    The path is unrolled into straight-line Python source, so there is no
+    per-node path slicing or component dispatch. Compiled functions are
+    cached by path.
+    """
+    return _compile_query(tuple(path))
+
+
+@lru_cache(maxsize=256)
+def _compile_query(path: tuple):
+    """Generate and exec the source for compile_query"""
+    # One function per fan-out point: q0 runs from the start of the path,
+    # qN from just after the fan-out at component N-1
+    lines = []
+    starts = {0} | {i + 1 for i, component in enumerate(path) if isinstance(component, str)}
+    for start in sorted(starts):
+        lines.append(f"def q{start}(d):")
+        for i in range(start, len(path)):
+            component = path[i]
+            if component == '*':
+                lines += [
+                    "    if not isinstance(d, list):",
+                    "        return None",
+                    f"    r = [x for x in map(q{i + 1}, d) if x is not None]",
+                    "    return r if r else None",
+                ]
+                break
+            if isinstance(component, str):
+                lines += [
+                    "    if isinstance(d, dict):",
+                    f"        if {component!r} not in d:",
+                    "            return None",
+                    f"        d = d[{component!r}]",
+                    "    elif isinstance(d, list):",
+                    f"        r = [x for x in (q{i + 1}(e[{component!r}]) for e in d",
+                    f"             if isinstance(e, dict) and {component!r} in e) if x is not None]",
+                    "        return r if r else None",
+                    "    else:",
+                    "        return None",
+                ]
+            else:
+                if component < 0:
+                    out_of_range = f"len(d) < {-component}"
+                else:
+                    out_of_range = f"len(d) <= {component}"
+                lines += [
+                    "    if isinstance(d, list):",
+                    f"        if {out_of_range}:",
+                    "            return None",
+                    f"        d = d[{component}]",
+                    "    elif isinstance(d, dict):",
+                    f"        if {component} not in d:",
+                    "            return None",
+                    f"        d = d[{component}]",
+                    "    else:",
+                    "        return None",
+                ]
+        else:
+            lines.append("    return d")
+        lines.append("")
+    
+    namespace = {}
+    exec('\n'.join(lines), namespace)
+    return namespace['q0']
+
+
+@lru_cache(maxsize=None)
+def _import_ijson():
+    """Import ijson on first use, or return None if it is missing"""
+    try:
+        import ijson
+    except ImportError:
+        return None
+    return ijson
+
+
+def streaming_prefix(path: Sequence[Union[str, int]]) -> Optional[tuple]:
+    """
+    Map a query path to an ijson prefix.
+    Returns (prefix, index, consumed) where index is None (single value),
+    an int (nth array item) or '*' (all array items), and consumed is the
+    number of path components covered by the prefix.
+    Returns None if the path cannot be streamed.
+    Examples:
+        ['config', 'db'] -> ('config.db', None, 2)
+        ['users', 0, 'name'] -> ('users.item', 0, 2)
+        ['items', '*'] -> ('items.item', '*', 2)
+    """
+    keys = []
+    for component in path:
+        if not isinstance(component, str) or component == '*':
+            break
+        # ijson joins levels with '.' and names array members 'item'
+        if not component or '.' in component or component == 'item':
+            return None
+        keys.append(component)
+    
+    if not keys:
+        return None
+    
+    consumed = len(keys)
+    if consumed == len(path):
+        return '.'.join(keys), None, consumed
+    
+    component = path[consumed]
+    if component == '*' and consumed == len(path) - 1:
+        return '.'.join(keys) + '.item', '*', consumed + 1
+    if isinstance(component, int) and component >= 0:
+        return '.'.join(keys) + '.item', component, consumed + 1
+    
+    return '.'.join(keys), None, consumed
+
+
+def _has_item_key(mapped: mmap.mmap) -> bool:
+    """True if the mapped JSON text may contain an object key named 'item'"""
+    if _ITEM_KEY_RE.search(mapped):
+        return True
+    return mapped.find(b'\\u') != -1 and _ESCAPED_ITEM_KEY_RE.search(mapped) is not None
+
+
+def stream_query(filename: str, path: Sequence[Union[str, int]]) -> tuple:
+    """
+    Query a JSON file with ijson, materializing only the matched subtree.
+    Returns (streamed, data); streamed is False when the file should be
+    parsed in full instead (no C ijson backend, small file, unsupported
+    path, no match or a parse error, which the full parse will report).
+    Objects with duplicate keys may give a different result than the
+    full parse, which keeps only the last value for each key.
+    """
+    ijson = _import_ijson()
+    if ijson is None or ijson.backend not in _IJSON_C_BACKENDS:
+        return False, None
+    
+    spec = streaming_prefix(path)
+    if spec is None:
+        return False, None
+    prefix, index, consumed = spec
+    
+    min_size = _STREAM_MIN_SIZE if orjson is None else _STREAM_ORJSON_MIN_SIZE
+    try:
+        if Path(filename).stat().st_size < min_size:
+            return False, None
+        
+        with open(filename, 'rb') as f:
+            if index is not None:
+                # '.item' would also match a map key named 'item'
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    if _has_item_key(mapped):
+                        return False, None
+            
+            # Every branch reads to the end so a malformed tail is reported
+            items = ijson.items(f, prefix, use_float=True)
+            if index == '*':
+                found = [item for item in items if item is not None]
+                result = found
+            elif index is not None:
+                found = [item for position, item in enumerate(items) if position == index]
+                result = found[0] if found else None
+            else:
+                # A prefix can match more than once only through duplicate
+                # keys; keep the last match
+                found = []
+                for item in items:
+                    found = [item]
+                result = found[0] if found else None
+    except Exception:
+        return False, None
+    
+    # Nothing matched; the path may still resolve through a list
+    if not found:
+        return False, None
+    
+    return True, query_data(result, path[consumed:])
+
+
 def filter_data(data: Any, filter_expr: str) -> Any:
     """
     Filter data based on expression.
@@ -262,7 +532,18 @@ def filter_data(data: Any, filter_expr: str) -> Any:
     if not filter_expr:
         return data
     
-    # Parse filter expression
+    condition = parse_filter_expr(filter_expr)
+    if condition is None:
+        return data
+    
+    return apply_filter(data, *condition)
+
+
+def parse_filter_expr(filter_expr: str) -> Optional[tuple]:
+    """
+    Parse filter expression into (key, operator, value).
+    Returns None if the expression contains no operator.
+    """
     operators = ['==', '!=', '>=', '<=', '>', '<', '~']
     operator = None
     key = None
@@ -277,27 +558,95 @@ def filter_data(data: Any, filter_expr: str) -> Any:
             break
     
     if not operator:
-        return data
+        return None
     
     # Parse value
     parsed_value = parse_filter_value(value)
     
-    # Apply filter
+    # Compile regex once instead of once per item
+    if operator == '~' and isinstance(parsed_value, str):
+        parsed_value = re.compile(parsed_value)
+    
+    return key, operator, parsed_value
+
+
+def apply_filter(data: Any, key: str, operator: str, value: Any) -> Any:
+    """Apply a parsed filter condition (see parse_filter_expr)"""
     if isinstance(data, list):
-        filtered = []
-        for item in data:
-            if isinstance(item, dict) and key in item:
-                item_value = item[key]
-                if check_condition(item_value, operator, parsed_value):
-                    filtered.append(item)
-        return filtered
+        return _filter_items(data, key, operator, value)
     elif isinstance(data, dict) and key in data:
-        if check_condition(data[key], operator, parsed_value):
+        if check_condition(data[key], operator, value):
             return data
     
     return None
 
 
+def query_and_filter(data: Any, path: Sequence[Union[str, int]], key: str,
+                     operator: str, value: Any) -> tuple:
+    """
+    Query data and filter the results in a single traversal.
+    Returns (found, filtered), where found is False when the query itself
+    matched nothing; filtered is what apply_filter would return for the
+    query result.
+    When the path fans out (wildcard or key over a list) only at its last
+    component, items are tested as they are reached instead of first
+    collecting the query result; other paths are queried then filtered.
+    """
+    if not path:
+        if data is None:
+            return False, None
+        return True, apply_filter(data, key, operator, value)
+    
+    # Descend through plain key/index steps to the last component
+    node = data
+    for component in path[:-1]:
+        if component == '*' or (isinstance(node, list) and not isinstance(component, int)):
+            result = query_data(data, path)
+            if result is None:
+                return False, None
+            return True, apply_filter(result, key, operator, value)
+        node = query_data(node, [component])
+        if node is None:
+            return False, None
+    
+    component = path[-1]
+    if not isinstance(node, list) or isinstance(component, int):
+        result = query_data(node, [component])
+        if result is None:
+            return False, None
+        return True, apply_filter(result, key, operator, value)
+    
+    if component == '*':
+        candidates = (item for item in node if item is not None)
+    else:
+        candidates = (item[component] for item in node
+                      if isinstance(item, dict) and item.get(component) is not None)
+    
+    # Candidates are never None, so None means the query matched nothing
+    first = next(candidates, None)
+    if first is None:
+        return False, None
+    return True, _filter_items(itertools.chain((first,), candidates), key, operator, value)
+
+
+def _filter_items(items: Iterable, key: str, operator: str, value: Any) -> list:
+    """Keep the dict items whose key satisfies the condition"""
+    compare = _OPERATORS.get(operator)
+    if compare is None:
+        return []
+    
+    # Resolve the operator once rather than in check_condition per item
+    filtered = []
+    for item in items:
+        if isinstance(item, dict) and key in item:
+            try:
+                if compare(item[key], value):
+                    filtered.append(item)
+            except (TypeError, AttributeError):
+                pass
+    return filtered
+
+
 def parse_filter_value(value: str) -> Any:
     """Parse filter value to appropriate type"""
     value = value.strip()
@@ -307,52 +656,57 @@ def parse_filter_value(value: str) -> Any:
        (value.startswith("'") and value.endswith("'")):
         return value[1:-1]
     
-    # Boolean
-    if value.lower() == 'true':
-        return True
-    if value.lower() == 'false':
-        return False
-    
-    # Null
-    if value.lower() in ('null', 'none'):
-        return None
+    # Boolean / null
+    constant = _FILTER_CONSTANTS.get(value.lower(), _NOT_CONSTANT)
+    if constant is not _NOT_CONSTANT:
+        return constant
     
     # Number
-    try:
-        if '.' in value:
-            return float(value)
-        return int(value)
-    except ValueError:
-        pass
+    number = _parse_number(value)
+    if number is not None:
+        return number
     
     return value
 
 
 def check_condition(item_value: Any, operator: str, filter_value: Any) -> bool:
-    """Check if condition is met"""
+    """
+    Check if condition is met.
+    For the '~' operator filter_value may be a regex string or a
+    pre-compiled pattern.
+    """
+    compare = _OPERATORS.get(operator)
+    if compare is None:
+        return False
+    
     try:
-        if operator == '==':
-            return item_value == filter_value
-        elif operator == '!=':
-            return item_value != filter_value
-        elif operator == '>':
-            return item_value > filter_value
-        elif operator == '<':
-            return item_value < filter_value
-        elif operator == '>=':
-            return item_value >= filter_value
-        elif operator == '<=':
-            return item_value <= filter_value
-        elif operator == '~':
-            # Regex match
-            if isinstance(item_value, str) and isinstance(filter_value, str):
-                return re.search(filter_value, item_value) is not None
+        return compare(item_value, filter_value)
     except (TypeError, AttributeError):
         return False
-    
+
+
+def _regex_match(item_value: Any, pattern: Any) -> bool:
+    """'~' operator: regex search in string values"""
+    if isinstance(item_value, str):
+        if isinstance(pattern, str):
+            return re.search(pattern, item_value) is not None
+        if isinstance(pattern, _REGEX_TYPE):
+            return pattern.search(item_value) is not None
     return False
 
 
+# Filter operators; comparisons are the C-implemented operator functions
+_OPERATORS = {
+    '==': eq,
+    '!=': ne,
+    '>': gt,
+    '<': lt,
+    '>=': ge,
+    '<=': le,
+    '~': _regex_match,
+}
+
+
 def search_data(data: Any, pattern: str, case_sensitive: bool = False) -> List[tuple]:
     """
     Search for pattern in all string values.
@@ -360,73 +714,185 @@ def search_data(data: Any, pattern: str, case_sensitive: bool = False) -> List[t
     """
     results = []
     flags = 0 if case_sensitive else re.IGNORECASE
+    regex = re.compile(pattern, flags)
     
-    def search_recursive(obj: Any, path: str = ''):
+    # Walk the tree with an explicit stack; paths are kept as tuples of
+    # keys and list indices and only formatted for matches
+    stack = [(data, ())]
+    while stack:
+        obj, path = stack.pop()
         if isinstance(obj, dict):
-            for key, value in obj.items():
-                new_path = f"{path}.{key}" if path else key
-                search_recursive(value, new_path)
+            stack.extend((value, path + (str(key),))
+                         for key, value in reversed(list(obj.items())))
         elif isinstance(obj, list):
-            for i, item in enumerate(obj):
-                new_path = f"{path}[{i}]"
-                search_recursive(item, new_path)
+            stack.extend((obj[i], path + (i,)) for i in range(len(obj) - 1, -1, -1))
         elif isinstance(obj, str):
-            if re.search(pattern, obj, flags):
-                results.append((path, obj))
+            if regex.search(obj):
+                results.append((format_path(path), obj))
     
-    search_recursive(data)
     return results
 
 
+def format_path(path: tuple) -> str:
+    """
+    Format path components as a query path.
+    Examples:
+        ('users', 0, 'email') -> 'users[0].email'
+        (2, 'name') -> '[2].name'
+    """
+    parts = []
+    for component in path:
+        if isinstance(component, int):
+            parts.append(f"[{component}]")
+        elif parts:
+            parts.append(f".{component}")
+        elif component:
+            parts.append(component)
+    return ''.join(parts)
+
+
 def calculate_stats(data: Any) -> Dict[str, Any]:
     """Calculate statistics on numeric data"""
-    numbers = []
+    # Ints are kept as exact Python ints; only floats use the float buffer
+    ints = []
+    floats = array('d')
     
-    def collect_numbers(obj: Any):
-        if isinstance(obj, (int, float)):
-            numbers.append(obj)
+    stack = [data]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, float):
+            floats.append(obj)
+        elif isinstance(obj, int):
+            ints.append(obj)
         elif isinstance(obj, dict):
-            for value in obj.values():
-                collect_numbers(value)
+            stack.extend(obj.values())
         elif isinstance(obj, list):
-            for item in obj:
-                collect_numbers(item)
-    
-    collect_numbers(data)
+            stack.extend(obj)
     
-    if not numbers:
+    count = len(ints) + len(floats)
+    if not count:
         return {'error': 'No numeric values found'}
     
+    total = sum(ints)
+    if floats:
+        try:
+            total += math.fsum(floats)
+        except (OverflowError, ValueError):
+            # fsum refuses inf - inf and overflowing partial sums; plain
+            # summation gives nan/inf for those, as it always did
+            total += sum(floats)
+    groups = [group for group in (ints, floats) if group]
+    
     return {
-        'count': len(numbers),
-        'sum': sum(numbers),
-        'avg': sum(numbers) / len(numbers),
-        'min': min(numbers),
-        'max': max(numbers)
+        'count': count,
+        'sum': total,
+        'avg': total / count,
+        'min': min(min(group) for group in groups),
+        'max': max(max(group) for group in groups)
     }
 
 
-def format_output(data: Any, format: str, pretty: bool = True) -> str:
-    """Format data for output"""
+def _has_wide_int(content: Union[str, bytes, mmap.mmap]) -> bool:
+    """
+    True if content holds a digit run orjson might not read exactly.
+    Runs inside strings or fractions also match; they only cost a
+    stdlib parse.
+    """
+    if isinstance(content, str):
+        return '0' * _WIDE_INT_RUN in content.translate(_STR_DIGITS_TO_ZERO)
+    
+    # Scan in overlapping chunks so a memory map is never copied whole
+    run = b'0' * _WIDE_INT_RUN
+    chunk_size = 1024 * 1024
+    for start in range(0, len(content), chunk_size):
+        chunk = content[max(start - _WIDE_INT_RUN + 1, 0):start + chunk_size]
+        if run in chunk.translate(_BYTES_DIGITS_TO_ZERO):
+            return True
+    return False
+
+
+def json_loads(content: Union[str, bytes]) -> tuple:
+    """
+    Parse JSON text, using orjson when it is installed.
+    Returns (plain, data); plain is True when orjson parsed the text, so
+    orjson can also write the data back exactly (see json_dumps). The
+    stdlib parses wide integers, which orjson turns into floats, and
+    NaN/Infinity, which it rejects.
+    """
+    if orjson is not None and not _has_wide_int(content):
+        try:
+            return True, orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # Non-standard literals or invalid JSON; the stdlib decides
+            pass
+    return False, json.loads(content)
+
+
+def load_json_mapped(filename: str) -> tuple:
+    """
+    Parse a JSON file with orjson straight from a read-only memory map.
+    Avoids reading the file into a bytes object and decoding it to str
+    before parsing; requires orjson. Returns (plain, data) and falls back
+    to the stdlib in the same cases as json_loads.
+    """
+    with open(filename, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            # madvise is only available on Python 3.8+ and some platforms
+            if hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            if not _has_wide_int(mapped):
+                try:
+                    with memoryview(mapped) as view:
+                        return True, orjson.loads(view)
+                except orjson.JSONDecodeError:
+                    pass
+            return False, json.loads(mapped[:])
+
+
+def json_dumps(data: Any, pretty: bool = True, plain: bool = False,
+               binary: bool = False) -> Union[str, bytes]:
+    """
+    Serialize data to JSON text.
+    orjson is used only for plain data (see json_loads); anything else may
+    hold NaN/Infinity, which orjson writes as null, or YAML types, and
+    goes through the stdlib. With binary=True orjson's UTF-8 bytes are
+    returned without decoding; the stdlib always returns str.
+    """
+    if plain and orjson is not None:
+        option = orjson.OPT_INDENT_2 if pretty else 0
+        try:
+            output = orjson.dumps(data, option=option)
+            return output if binary else output.decode('utf-8')
+        except TypeError:
+            # orjson rejects integers wider than 64 bits; stdlib handles them
+            pass
+    indent = 2 if pretty else None
+    # default=str covers YAML timestamps, sets and binary values
+    return json.dumps(data, indent=indent, ensure_ascii=False, default=str)
+
+
+def format_output(data: Any, format: str, pretty: bool = True,
+                  plain: bool = False, binary: bool = False) -> Union[str, bytes]:
+    """
+    Format data for output.
+    plain and binary are passed on to json_dumps, so with binary=True
+    JSON output may be returned as UTF-8 bytes; other output is always str.
+    """
     if data is None:
         return 'null'
     
     if format == 'json':
-        indent = 2 if pretty else None
-        return json.dumps(data, indent=indent, ensure_ascii=False)
+        return json_dumps(data, pretty, plain, binary)
     
     elif format == 'csv':
         # Simple CSV output for list of dicts
         if isinstance(data, list) and data and isinstance(data[0], dict):
-            lines = []
-            # Header
             headers = list(data[0].keys())
-            lines.append(','.join(str(h) for h in headers))
-            # Rows
-            for item in data:
-                row = [str(item.get(h, '')) for h in headers]
-                lines.append(','.join(row))
-            return '\n'.join(lines)
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator='\n')
+            writer.writerow(headers)
+            writer.writerows([item.get(h, '') for h in headers] for item in data)
+            return buffer.getvalue().rstrip('\n')
         else:
             return json.dumps(data)
     
@@ -451,13 +917,32 @@ def format_output(data: Any, format: str, pretty: bool = True) -> str:
     elif format == 'plain':
         # Plain text output
         if isinstance(data, (list, dict)):
-            return json.dumps(data, indent=2, ensure_ascii=False)
+            return json_dumps(data, plain=plain, binary=binary)
         else:
             return str(data)
     
     return str(data)
 
 
+def write_output(output: Union[str, bytes]):
+    """
+    Write output and a trailing newline to stdout.
+    Bytes go straight to the binary buffer, skipping a decode/encode
+    round trip through the text layer.
+    """
+    if isinstance(output, (bytes, bytearray)):
+        buffer = getattr(sys.stdout, 'buffer', None)
+        if buffer is not None:
+            sys.stdout.flush()
+            buffer.write(output)
+            buffer.write(b'\n')
+            return
+        output = output.decode('utf-8')
+    
+    sys.stdout.write(output)
+    sys.stdout.write('\n')
+
+
 def print_banner():
     """Print JSONQuery banner"""
     banner = f"""
@@ -514,40 +999,70 @@ Examples:
     
     args = parser.parse_args()
     
-    # Read input
-    try:
-        if args.file == '-':
-            content = sys.stdin.read()
-        else:
-            with open(args.file, 'r', encoding='utf-8') as f:
-                content = f.read()
-    except FileNotFoundError:
-        print(f"{Colors.RED}✗ File not found: {args.file}{Colors.RESET}", file=sys.stderr)
-        return 1
-    except Exception as e:
-        print(f"{Colors.RED}✗ Error reading file: {e}{Colors.RESET}", file=sys.stderr)
-        return 1
+    is_yaml = args.yaml or (args.file != '-' and args.file.endswith(('.yaml', '.yml')))
     
-    # Parse data
-    try:
-        if args.yaml or (args.file != '-' and args.file.endswith(('.yaml', '.yml'))):
-            data = YAMLParser.parse(content)
-        else:
-            data = json.loads(content)
-    except json.JSONDecodeError as e:
-        print(f"{Colors.RED}✗ Invalid JSON: {e}{Colors.RESET}", file=sys.stderr)
-        return 1
-    except Exception as e:
-        print(f"{Colors.RED}✗ Error parsing data: {e}{Colors.RESET}", file=sys.stderr)
-        return 1
+    # Stream simple queries over large JSON files instead of loading them whole
+    streamed = False
+    if args.query and not is_yaml and args.file != '-':
+        streamed, data = stream_query(args.file, parse_query_path(args.query))
     
-    # Apply query
+    # Only data parsed by orjson or ijson is written back with orjson
+    plain = streamed
+    if not streamed:
+        # Read input; large JSON files are parsed from a memory map instead
+        content = None
+        try:
+            if args.file == '-':
+                content = sys.stdin.read()
+            elif is_yaml or orjson is None or Path(args.file).stat().st_size < _MMAP_MIN_SIZE:
+                with open(args.file, 'r', encoding='utf-8') as f:
+                    content = f.read()
+        except FileNotFoundError:
+            print(f"{Colors.RED}✗ File not found: {args.file}{Colors.RESET}", file=sys.stderr)
+            return 1
+        except Exception as e:
+            print(f"{Colors.RED}✗ Error reading file: {e}{Colors.RESET}", file=sys.stderr)
+            return 1
+    
+        # Parse data
+        try:
+            if content is None:
+                plain, data = load_json_mapped(args.file)
+            elif is_yaml:
+                data = YAMLParser.parse(content)
+            else:
+                plain, data = json_loads(content)
+        except json.JSONDecodeError as e:
+            print(f"{Colors.RED}✗ Invalid JSON: {e}{Colors.RESET}", file=sys.stderr)
+            return 1
+        except Exception as e:
+            print(f"{Colors.RED}✗ Error parsing data: {e}{Colors.RESET}", file=sys.stderr)
+            return 1
+    
+    # Apply query, fused with the filter when both are given
+    filtered = False
     if args.query:
+        condition = None
+        if args.filter:
+            try:
+                condition = parse_filter_expr(args.filter)
+            except Exception:
+                # Not fused; the filter step reports it once the query matched
+                pass
+        
         try:
             path = parse_query_path(args.query)
-            data = query_data(data, path)
             
-            if data is None:
+            if streamed:
+                found = data is not None
+            elif condition is not None:
+                found, data = query_and_filter(data, path, *condition)
+                filtered = True
+            else:
+                data = compile_query(path)(data)
+                found = data is not None
+            
+            if not found:
                 print(f"{Colors.YELLOW}No results found{Colors.RESET}", file=sys.stderr)
                 return 0
         except Exception as e:
@@ -557,7 +1072,8 @@ Examples:
     # Apply filter
     if args.filter:
         try:
-            data = filter_data(data, args.filter)
+            if not filtered:
+                data = filter_data(data, args.filter)
             
             if not data:
                 print(f"{Colors.YELLOW}No results match filter{Colors.RESET}", file=sys.stderr)
@@ -586,13 +1102,13 @@ Examples:
     # Statistics
     if args.stats:
         stats = calculate_stats(data)
-        print(format_output(stats, 'json', not args.no_pretty))
+        write_output(format_output(stats, 'json', not args.no_pretty, plain, binary=True))
         return 0
     
     # Output
     try:
-        output = format_output(data, args.format, not args.no_pretty)
-        print(output)
+        output = format_output(data, args.format, not args.no_pretty, plain, binary=True)
+        write_output(output)
     except Exception as e:
         print(f"{Colors.RED}✗ Output error: {e}{Colors.RESET}", file=sys.stderr)
         return 1
@@ -10,6 +10,11 @@ setup(
     author_email='contact@metaphy.io',
     url='https://github.com/DonkRonk17/JSONQuery',
     py_modules=['jsonquery'],
+    extras_require={
+        'fast': ['orjson'],
+        'stream': ['ijson>=3.1'],
+        'yaml': ['PyYAML'],
+    },
     entry_points={
         'console_scripts': [
             'jsonquery=jsonquery:main',